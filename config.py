@@ -1,12 +1,19 @@
 import os
-from typing import Optional
-from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Dict, Optional
+from dotenv import dotenv_values, find_dotenv
 
-# 加载环境变量
-load_dotenv()
+# 与 load_dotenv() 一致：从本模块所在目录向上查找 .env，不依赖当前工作目录；
+# 未找到时使用本模块同目录下的 .env（之后创建也能被 refresh_env 加载）
+ENV_FILE = find_dotenv() or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
 
-class Config(BaseSettings):
+# .env 解析缓存（按文件修改时间失效）
+_ENV_MTIME: Optional[float] = None
+_ENV_CACHE: Dict[str, str] = {}
+
+@dataclass(slots=True, frozen=True)
+class Config:
     """配置类"""
     
     # WebSocket配置
@@ -17,10 +24,13 @@ class Config(BaseSettings):
     TELEGRAM_CHAT_ID: str = ""
     
     # 连接配置
-    RECONNECT_INTERVAL: int = 100  # 100ms重连间隔，更快重连
+    RECONNECT_INITIAL_MS: int = 100  # 首次重连间隔100ms，瞬时断线快速恢复
+    RECONNECT_MAX_MS: int = 30000  # 重连间隔上限30秒，避免长时间故障时重连风暴
+    RECONNECT_BACKOFF: float = 3.0  # 重连间隔退避倍数：下次间隔在[首次间隔, 上次间隔×倍数]内随机
     MAX_RECONNECT_ATTEMPTS: int = 99999
-    HEARTBEAT_INTERVAL: int = 100  # 100ms心跳，更频繁
+    HEARTBEAT_INTERVAL: int = 20000  # 20秒心跳，与常见WebSocket服务端保持一致
     CONNECTION_TIMEOUT: int = 500  # 500ms连接超时，更快检测
+    WS_COMPRESSION: str = ""  # WebSocket压缩：deflate 启用permessage-deflate，留空则关闭
     
     # 日志配置
     LOG_LEVEL: str = "INFO"
@@ -29,20 +39,84 @@ class Config(BaseSettings):
     # 消息处理配置
     MAX_MESSAGE_LENGTH: int = 4096  # Telegram消息最大长度
     BATCH_SIZE: int = 10  # 批处理大小
+    MAX_TG_QUEUE: int = 512  # Telegram发送队列上限，满时丢弃最旧消息
+    WS_WORKERS: int = 8  # WebSocket消息处理协程数
     
     # 性能监控
     ENABLE_PERFORMANCE_MONITORING: bool = True
     LATENCY_THRESHOLD_MS: int = 1000  # 延迟阈值
     
-    class Settings:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+def _cast(value: str, field_type: type):
+    """将环境变量字符串转换为字段类型"""
+    if field_type is bool:
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return field_type(value)
+
+def refresh_env(path: str = ENV_FILE) -> Dict[str, str]:
+    """将 .env 加载到环境变量，文件修改时间未变时直接返回缓存"""
+    global _ENV_MTIME, _ENV_CACHE
+    
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return _ENV_CACHE
+        
+    if mtime == _ENV_MTIME:
+        return _ENV_CACHE
+        
+    values = {k: v for k, v in dotenv_values(path).items() if v is not None}
+    for key, value in values.items():
+        # 进程环境变量优先，只更新未设置或来自上次 .env 的值
+        if key not in os.environ or os.environ[key] == _ENV_CACHE.get(key):
+            os.environ[key] = value
+            
+    _ENV_MTIME = mtime
+    _ENV_CACHE = values
+    return _ENV_CACHE
+
+@lru_cache(maxsize=1)
+def _load() -> Config:
+    """加载配置（每个进程只解析一次 .env）"""
+    # 加载环境变量，不覆盖已存在的进程环境变量
+    refresh_env()
+    
+    # 环境变量覆盖默认值
+    overrides = {}
+    for field in fields(Config):
+        value = os.getenv(field.name)
+        if value is not None:
+            overrides[field.name] = _cast(value, field.type)
+    
+    # websockets只支持deflate，其他取值会让每次connect()都抛出异常，启动时直接拒绝
+    compression = overrides.get("WS_COMPRESSION", "")
+    if compression not in ("", "deflate"):
+        raise ValueError(f"WS_COMPRESSION 仅支持 deflate 或留空，当前值: {compression!r}")
+    return Config(**overrides)
 
 # 创建全局配置实例
-config = Config()
+config = _load()
+
+# 常用配置项绑定为模块级名称，热路径读取时省去属性查找
+WSS_URL = config.WSS_URL
+TELEGRAM_BOT_TOKEN = config.TELEGRAM_BOT_TOKEN
+TELEGRAM_CHAT_ID = config.TELEGRAM_CHAT_ID
+RECONNECT_INITIAL_MS = config.RECONNECT_INITIAL_MS
+RECONNECT_MAX_MS = config.RECONNECT_MAX_MS
+RECONNECT_BACKOFF = config.RECONNECT_BACKOFF
+MAX_RECONNECT_ATTEMPTS = config.MAX_RECONNECT_ATTEMPTS
+HEARTBEAT_INTERVAL = config.HEARTBEAT_INTERVAL
+CONNECTION_TIMEOUT = config.CONNECTION_TIMEOUT
+WS_COMPRESSION = config.WS_COMPRESSION or None
+LOG_LEVEL = config.LOG_LEVEL
+LOG_FILE = config.LOG_FILE
+MAX_MESSAGE_LENGTH = config.MAX_MESSAGE_LENGTH
+BATCH_SIZE = config.BATCH_SIZE
+MAX_TG_QUEUE = config.MAX_TG_QUEUE
+WS_WORKERS = config.WS_WORKERS
+ENABLE_PERFORMANCE_MONITORING = config.ENABLE_PERFORMANCE_MONITORING
+LATENCY_THRESHOLD_MS = config.LATENCY_THRESHOLD_MS
 
-# 如果环境变量存在，覆盖默认值
-if os.getenv("TELEGRAM_BOT_TOKEN"):
-    config.TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-if os.getenv("TELEGRAM_CHAT_ID"):
-    config.TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID") 
\ No newline at end of file
+# 毫秒配置预先换算为秒，供asyncio.sleep直接使用
+RECONNECT_INITIAL_S = RECONNECT_INITIAL_MS / 1000
+RECONNECT_MAX_S = RECONNECT_MAX_MS / 1000
+HEARTBEAT_INTERVAL_S = HEARTBEAT_INTERVAL / 1000
@@ -8,20 +8,41 @@ import signal
 import sys
 import os
 from pathlib import Path
+from typing import Optional
 from loguru import logger
-import config
-from websocket_client import WebSocketClient
+from config import WSS_URL, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, LOG_LEVEL, LOG_FILE
+
+# 日志格式
+CONSOLE_LOG_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+FILE_LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+
+# 创建日志目录（导入时执行一次）
+try:
+    Path(LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+except OSError as e:
+    logger.error(f"创建日志目录失败: {e}")
 
 class TelegramForwarder:
     """Telegram转发器主类"""
     
     def __init__(self):
+        # 延迟导入，websockets/telegram 依赖只在真正创建转发器时加载
+        from websocket_client import WebSocketClient
+        
         self.websocket_client = WebSocketClient()
         self.is_running = False
+        self._stop_event: Optional[asyncio.Event] = None
+        self._websocket_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._stopped = asyncio.Event()
+        self.exit_code = 0
         
     async def start(self):
         """启动转发器"""
         try:
+            # 停止事件需在事件循环内创建
+            self._stop_event = asyncio.Event()
+            
             # 设置日志
             self._setup_logging()
             
@@ -32,102 +53,140 @@ class TelegramForwarder:
             self._setup_signal_handlers()
             
             logger.info("🚀 启动Twitter推文转发到Telegram服务")
-            logger.info(f"📡 WebSocket URL: {config.config.WSS_URL}")
-            logger.info(f"📱 Telegram Chat ID: {config.config.TELEGRAM_CHAT_ID}")
+            # 使用loguru参数格式化，级别过滤掉时不做字符串插值
+            logger.info("📡 WebSocket URL: {}", WSS_URL)
+            logger.info("📱 Telegram Chat ID: {}", TELEGRAM_CHAT_ID)
+            logger.info("⚙️ 事件循环: {}", type(asyncio.get_running_loop()).__module__)
             
             self.is_running = True
             
-            # 启动WebSocket客户端
-            await self.websocket_client.start()
+            # 启动WebSocket客户端，客户端自行退出时同样触发停止
+            self._websocket_task = asyncio.create_task(self.websocket_client.start())
+            self._websocket_task.add_done_callback(self._on_websocket_done)
             
         except Exception as e:
             logger.error(f"启动失败: {e}")
             sys.exit(1)
             
     async def stop(self):
-        """停止转发器"""
-        logger.info("🛑 正在停止服务...")
-        self.is_running = False
+        """停止转发器（可重复调用，并发调用会等待同一次停止完成）"""
+        if self._stopping:
+            await self._stopped.wait()
+            return
+        self._stopping = True
         
-        if self.websocket_client:
-            await self.websocket_client.stop()
+        try:
+            logger.info("🛑 正在停止服务...")
+            self.is_running = False
+            
+            if self._stop_event:
+                self._stop_event.set()
+            
+            if self.websocket_client:
+                await self.websocket_client.stop()
+                
+            logger.info("✅ 服务已停止")
             
-        logger.info("✅ 服务已停止")
+            # 等待后台队列中的日志写完
+            await logger.complete()
+        finally:
+            self._stopped.set()
         
     def _setup_logging(self):
         """设置日志配置"""
-        # 创建日志目录
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
-        
         # 移除默认处理器
         logger.remove()
         
         # 添加控制台处理器
         logger.add(
             sys.stdout,
-            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-            level=config.config.LOG_LEVEL,
+            format=CONSOLE_LOG_FORMAT,
+            level=LOG_LEVEL,
             colorize=True
         )
         
-        # 添加文件处理器
+        # 添加文件处理器（enqueue=True 由后台线程写文件和压缩归档，不阻塞事件循环）
         logger.add(
-            config.config.LOG_FILE,
-            format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-            level=config.config.LOG_LEVEL,
-            rotation="10 MB",
-            retention="7 days",
-            compression="gz"
+            LOG_FILE,
+            format=FILE_LOG_FORMAT,
+            level=LOG_LEVEL,
+            rotation="50 MB",
+            retention=10,
+            compression="gz",
+            enqueue=True
         )
         
     def _validate_config(self):
         """验证配置"""
-        if not config.config.TELEGRAM_BOT_TOKEN:
+        if not TELEGRAM_BOT_TOKEN:
             raise ValueError("TELEGRAM_BOT_TOKEN 未配置")
             
-        if not config.config.TELEGRAM_CHAT_ID:
+        if not TELEGRAM_CHAT_ID:
             raise ValueError("TELEGRAM_CHAT_ID 未配置")
             
-        if not config.config.WSS_URL:
+        if not WSS_URL:
             raise ValueError("WSS_URL 未配置")
             
         logger.info("✅ 配置验证通过")
         
     def _setup_signal_handlers(self):
-        """设置信号处理器"""
-        def signal_handler(signum, frame):
-            logger.info(f"收到信号 {signum}，准备停止服务")
-            asyncio.create_task(self.stop())
-            
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        """设置信号处理器（需在事件循环运行时调用）"""
+        loop = asyncio.get_running_loop()
+        
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            if sys.platform.startswith('win'):
+                # Windows事件循环不支持add_signal_handler，回退到signal.signal
+                signal.signal(sig, lambda signum, frame: loop.call_soon_threadsafe(self._on_signal, signum))
+            else:
+                loop.add_signal_handler(sig, self._on_signal, sig)
+                
+    def _on_websocket_done(self, task: asyncio.Task):
+        """WebSocket客户端退出回调：记录异常并以非零状态码退出"""
+        if not task.cancelled() and task.exception() is not None:
+            exc = task.exception()
+            logger.opt(exception=exc).error(f"WebSocket客户端异常退出: {exc}")
+            self.exit_code = 1
+        self._stop_event.set()
+        
+    def _on_signal(self, sig):
+        """信号回调，在事件循环中执行"""
+        logger.info(f"收到信号 {sig}，准备停止服务")
+        self._stop_event.set()
         
-    async def run(self):
-        """运行转发器"""
+    async def run(self) -> int:
+        """运行转发器，返回进程退出码"""
         try:
             await self.start()
             
-            # 保持运行
-            while self.is_running:
-                await asyncio.sleep(1)
+            # 等待停止事件
+            await self._stop_event.wait()
                 
         except KeyboardInterrupt:
             logger.info("收到中断信号")
         except Exception as e:
             logger.error(f"运行时错误: {e}")
+            self.exit_code = 1
         finally:
             await self.stop()
+            
+        return self.exit_code
 
-async def main():
-    """主函数"""
+async def main() -> int:
+    """主函数，返回进程退出码"""
     forwarder = TelegramForwarder()
-    await forwarder.run()
+    return await forwarder.run()
 
 if __name__ == "__main__":
     # 设置事件循环策略（Windows兼容性）
     if sys.platform.startswith('win'):
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    else:
+        # 优先使用uvloop，未安装时回退到默认事件循环
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
         
     # 运行主程序
-    asyncio.run(main()) 
\ No newline at end of file
+    sys.exit(asyncio.run(main()))
\ No newline at end of file
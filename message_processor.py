@@ -1,83 +1,294 @@
 import json
 import re
+import time
+from functools import lru_cache
+from itertools import chain
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timezone, timedelta
+import orjson
 from loguru import logger
-import config
+from config import MAX_MESSAGE_LENGTH
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# 地址扫描优先使用RE2（线性时间匹配，不会因回溯退化），未安装时回退到re
+try:
+    import re2 as address_re
+except ImportError:
+    address_re = re
 
 # 定义中国时区 (UTC+8)
 CHINA_TIMEZONE = timezone(timedelta(hours=8))
 
+def _json_loads(raw: str) -> Any:
+    """解析JSON，优先使用orjson；orjson拒绝的输入（如孤立代理字符）回退到标准库"""
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return json.loads(raw)
+
+def _json_dumps_pretty(data: Any) -> str:
+    """格式化输出JSON（缩进2，保留非ASCII字符）"""
+    try:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    except TypeError:
+        return json.dumps(data, ensure_ascii=False, indent=2)
+
+# 时间显示格式
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+@lru_cache(maxsize=1)
+def _iso_at_second(second: int) -> str:
+    """指定秒的本地ISO时间字符串（同一秒内复用）"""
+    return datetime.fromtimestamp(second).isoformat()
+
+@lru_cache(maxsize=1)
+def _china_time_at_second(second: int) -> str:
+    """指定秒的中国时区时间字符串（同一秒内复用）"""
+    return datetime.fromtimestamp(second, CHINA_TIMEZONE).strftime(TIME_FORMAT)
+
+def _now_iso() -> str:
+    """当前时间的ISO字符串，精确到秒"""
+    return _iso_at_second(int(time.time()))
+
+def _now_china_time() -> str:
+    """当前中国时区时间字符串"""
+    return _china_time_at_second(int(time.time()))
+
+# 时间格式：一次匹配即可确定格式，无需逐个尝试strptime
+_TS_UNIX_RE = re.compile(r'[+-]?\d+$')
+_TS_ISO_RE = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})'
+    r'(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6})\d*)?)?)?'
+    r'(Z|[+-]\d{2}:?\d{2})?$'
+)
+_TS_TWITTER_RE = re.compile(
+    r'[A-Za-z]{3} ([A-Za-z]{3}) (\d{1,2}) (\d{2}):(\d{2}):(\d{2}) ([+-]\d{4}) (\d{4})$'
+)
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+def _from_timestamp(timestamp: int) -> datetime:
+    """Unix时间戳转换为UTC时间，自动识别毫秒时间戳"""
+    if timestamp > 1000000000000:  # 毫秒时间戳
+        timestamp = timestamp / 1000
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+@lru_cache(maxsize=64)
+def _parse_utc_offset(tz: Optional[str]) -> timezone:
+    """解析时区偏移 (Z / +08:00 / -0500)，缺省视为UTC；同一偏移复用同一时区对象"""
+    if not tz or tz == 'Z':
+        return timezone.utc
+    sign = -1 if tz[0] == '-' else 1
+    digits = tz[1:].replace(':', '')
+    return timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:])))
+
+@lru_cache(maxsize=4096)
+def _parse_time(time_str: str) -> Optional[str]:
+    """解析多种时间格式并转换为中国时区 (UTC+8)，结果按输入缓存"""
+    if time_str is None or time_str == '':
+        return None
+    
+    try:
+        # Unix时间戳 (秒或毫秒)，可能直接是JSON数字
+        if isinstance(time_str, (int, float)):
+            tweet_time = _from_timestamp(int(time_str))
+        else:
+            time_str = time_str.strip()
+            tweet_time = None
+            
+            if _TS_UNIX_RE.match(time_str):
+                tweet_time = _from_timestamp(int(time_str))
+                
+            # ISO格式 (2025-08-01T14:30:00Z / 2025-08-01 14:30:00 / 2025-08-01 等)
+            elif match := _TS_ISO_RE.match(time_str):
+                year, month, day, hour, minute, second, fraction, tz = match.groups()
+                tweet_time = datetime(
+                    int(year), int(month), int(day),
+                    int(hour or 0), int(minute or 0), int(second or 0),
+                    int(fraction.ljust(6, '0')) if fraction else 0,
+                    tzinfo=_parse_utc_offset(tz)
+                )
+                
+            # Twitter格式 (Wed Aug 01 14:30:00 +0000 2025)
+            elif match := _TS_TWITTER_RE.match(time_str):
+                month_name, day, hour, minute, second, tz, year = match.groups()
+                month = _MONTHS.get(month_name.lower())
+                if month:
+                    tweet_time = datetime(
+                        int(year), month, int(day),
+                        int(hour), int(minute), int(second),
+                        tzinfo=_parse_utc_offset(tz)
+                    )
+                    
+        if tweet_time is None:
+            return None
+            
+        # 转换为中国时区
+        return tweet_time.astimezone(CHINA_TIMEZONE).strftime(TIME_FORMAT)
+        
+    except (ValueError, OverflowError, OSError):
+        # 格式匹配但数值越界 (如13月)，视为无法解析
+        return None
+    except Exception as e:
+        logger.error(f"时间解析错误: {e}, 时间字符串: {time_str}")
+        return None
+
+class _BoundedBuilder:
+    """按长度上限拼接消息文本，超出上限后不再追加，结果与整体拼接后截断一致"""
+    
+    def __init__(self, limit: int, keep: int):
+        self.limit = limit  # 超过该长度即截断
+        self.keep = keep  # 截断后保留的长度
+        self.parts: List[str] = []
+        self.length = 0
+        self.truncated = False
+        
+    def append(self, text: str) -> bool:
+        """追加文本，已超出上限时返回False"""
+        if self.truncated:
+            return False
+        self.parts.append(text)
+        self.length += len(text)
+        if self.length > self.limit:
+            self.truncated = True
+            return False
+        return True
+        
+    def finish(self) -> str:
+        """返回最终文本，超出上限时截断并追加省略号"""
+        text = ''.join(self.parts)
+        if self.truncated:
+            return text[:self.keep] + "..."
+        return text
+
 class MessageProcessor:
     """消息处理器，用于解析和格式化UTrack WebSocket消息"""
     
-    def __init__(self):
-        self.twitter_url_patterns = [
-            r'https?://(?:www\.)?twitter\.com',
-            r'https?://(?:www\.)?t\.co',
-            r'https?://(?:www\.)?x\.com'
-        ]
+    # 预编译正则，避免每条消息重复查找re模块缓存
+    # Twitter URL (twitter.com / t.co / x.com) 合并为一个模式，单次扫描
+    _TWITTER_URL_RE = re.compile(r'https?://(?:www\.)?(?:twitter\.com|t\.co|x\.com)', re.IGNORECASE)
+    # Solana地址模式 (base58, 32-44字符)
+    _SOLANA_RE = address_re.compile(rb'\b[1-9A-HJ-NP-Za-km-z]{32,44}\b')
+    # base58字节查找表：合法字符映射为0，其余为1；连续32个0才可能是Solana地址
+    _BASE58_TABLE = bytes(
+        0 if chr(i) in '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz' else 1
+        for i in range(256)
+    )
+    _BASE58_MIN_RUN = b'\x00' * 32
+    # Ethereum地址模式 (0x开头，40个十六进制字符)
+    _ETH_RE = address_re.compile(rb'0x[a-fA-F0-9]{40}')
+    # 推文相关JSON字段名
+    _TWEET_FIELD_RE = re.compile(r'"(?:tweet|twitter|text|user|created_at)"', re.IGNORECASE)
+    # JSON消息开头（允许前导空白），match无需复制字符串
+    _JSON_START_RE = re.compile(r'\s*[{\[]')
+    # JSON对象开头（允许前导空白）
+    _JSON_OBJECT_START_RE = re.compile(r'\s*\{')
+    # JSON对象使用：Twitter URL 或推文字段任一命中即返回，单次扫描
+    _TWITTER_HINT_RE = re.compile(f'{_TWITTER_URL_RE.pattern}|{_TWEET_FIELD_RE.pattern}', re.IGNORECASE)
+    
+    # 推文类型emoji映射
+    _TWEET_TYPE_EMOJI = {
+        'TWEET': '📝',
+        'REPLY': '💬',
+        'RETWEET': '🔄',
+        'QUOTE': '💭'
+    }
+    
+    # 推文消息模板，缺失的可选段落填空字符串，一次format_map完成拼接
+    _TWEET_TEMPLATE = (
+        "{emoji} <b>推文更新</b>\n\n"
+        "<b>推文类型:</b> {emoji} {tweet_type}\n"
+        "<b>用户名:</b> @{handle}\n"
+        "{name_line}{reply_line}{text_line}{ca_block}{mentions_line}{mentions_ca_block}"
+        "<b>推文链接:</b> https://x.com/{handle}/status/{tweet_id}\n"
+        "{time_line}{media_line}"
+    )
+    
+    # 关注消息类型配置
+    _FOLLOWING_TYPE_CONFIG = {
+        'following.create': {'emoji': '➕', 'title': '新增关注'},
+        'following.update': {'emoji': '🔄', 'title': '关注更新'},
+        'following.delete': {'emoji': '➖', 'title': '取消关注'},
+        'follower.create': {'emoji': '👤', 'title': '新增粉丝'},
+        'follower.update': {'emoji': '🔄', 'title': '粉丝更新'},
+        'follower.delete': {'emoji': '👋', 'title': '粉丝流失'}
+    }
+    _FOLLOWING_DEFAULT_CONFIG = {'emoji': '📡', 'title': '关注变动'}
+    
+    # 资料更新消息类型配置
+    _PROFILE_UPDATE_TYPE_CONFIG = {
+        'profile.update': {'emoji': '👤', 'title': '用户资料更新'}
+    }
+    _PROFILE_UPDATE_DEFAULT_CONFIG = {'emoji': '📝', 'title': '资料更新'}
+    
+    # 常见加密货币关键词（及预先转换的大写形式）
+    _CRYPTO_KEYWORDS = (
+        '$BTC', '$ETH', '$SOL', '$USDT', '$USDC', 
+        'CA:', 'Contract:', 'DeFi', 'NFT', 'Token',
+        'CA =', 'Contract Address', 'Smart Contract',
+        'Token Address', 'Contract Addr'
+    )
+    _CRYPTO_KEYWORDS_UPPER = tuple(keyword.upper() for keyword in _CRYPTO_KEYWORDS)
+    
+    # 关键词Aho–Corasick自动机，一次扫描匹配全部关键词（未安装pyahocorasick时为None）
+    if ahocorasick is not None:
+        _CRYPTO_KEYWORDS_AC = ahocorasick.Automaton()
+        for _index, _keyword_upper in enumerate(_CRYPTO_KEYWORDS_UPPER):
+            _CRYPTO_KEYWORDS_AC.add_word(_keyword_upper, _index)
+        _CRYPTO_KEYWORDS_AC.make_automaton()
+        del _index, _keyword_upper
+    else:
+        _CRYPTO_KEYWORDS_AC = None
         
     def is_twitter_message(self, message_content: str) -> bool:
         """检查是否为Twitter消息"""
         if not message_content:
             return False
             
-        # 检查是否包含Twitter URL
-        for pattern in self.twitter_url_patterns:
-            if re.search(pattern, message_content, re.IGNORECASE):
-                return True
-                
-        # 检查消息结构
-        try:
-            data = json.loads(message_content)
-            if isinstance(data, dict):
-                # 检查是否包含推文相关字段
-                tweet_fields = ['tweet', 'twitter', 'text', 'user', 'created_at']
-                if any(field in str(data).lower() for field in tweet_fields):
-                    return True
-        except (json.JSONDecodeError, TypeError):
-            pass
-            
-        return False
-        
-    def extract_contract_info(self, text: str) -> List[str]:
-        """提取智能合约信息"""
+        # JSON对象：直接扫描原始字符串，Twitter URL或推文相关字段首次命中即返回，无需反序列化
+        if self._JSON_OBJECT_START_RE.match(message_content):
+            return self._TWITTER_HINT_RE.search(message_content) is not None
+            
+        # 其他消息：检查是否包含Twitter URL
+        return self._TWITTER_URL_RE.search(message_content) is not None
+        
+    @classmethod
+    def extract_contract_info(cls, text: str) -> List[str]:
+        """提取智能合约信息（只依赖类级别的正则和查找表）"""
         contract_info = []
         
         if not text:
             return contract_info
         
-        # Solana地址模式 (base58, 32-44字符)
-        solana_pattern = r'\b[1-9A-HJ-NP-Za-km-z]{32,44}\b'
-        solana_matches = re.findall(solana_pattern, text)
-        
-        if solana_matches:
-            for address in solana_matches:
-                # 简单验证：Solana地址通常以特定字符开头
-                if len(address) >= 32 and len(address) <= 44:
-                    contract_info.append(f"🟣 Solana: `{address}`")
-        
-        # Ethereum地址模式 (0x开头，40个十六进制字符)
-        eth_pattern = r'0x[a-fA-F0-9]{40}'
-        eth_matches = re.findall(eth_pattern, text)
-        
-        if eth_matches:
-            for address in eth_matches:
-                contract_info.append(f"🔷 Ethereum: `{address}`")
-        
-        # 常见加密货币关键词
-        crypto_keywords = [
-            '$BTC', '$ETH', '$SOL', '$USDT', '$USDC', 
-            'CA:', 'Contract:', 'DeFi', 'NFT', 'Token',
-            'CA =', 'Contract Address', 'Smart Contract',
-            'Token Address', 'Contract Addr'
-        ]
-        
-        found_keywords = []
-        for keyword in crypto_keywords:
-            if keyword.upper() in text.upper():
-                found_keywords.append(keyword)
+        # 地址均为ASCII，在UTF-8字节上匹配（surrogatepass兼容JSON中的孤立代理字符）
+        text_bytes = text.encode('utf-8', 'surrogatepass')
+        
+        # Solana地址：先用查找表确认存在足够长的base58连续片段，没有则跳过正则
+        if cls._BASE58_MIN_RUN in text_bytes.translate(cls._BASE58_TABLE):
+            # dict.fromkeys 按出现顺序去重，重复地址只输出一次
+            for address in dict.fromkeys(cls._SOLANA_RE.findall(text_bytes)):
+                contract_info.append(f"🟣 Solana: `{address.decode()}`")
+        
+        # Ethereum地址
+        for address in dict.fromkeys(cls._ETH_RE.findall(text_bytes)):
+            contract_info.append(f"🔷 Ethereum: `{address.decode()}`")
+        
+        # 常见加密货币关键词（文本只转换一次大写）
+        text_upper = text.upper()
+        if cls._CRYPTO_KEYWORDS_AC is not None:
+            found_indexes = {index for _, index in cls._CRYPTO_KEYWORDS_AC.iter(text_upper)}
+            found_keywords = [cls._CRYPTO_KEYWORDS[index] for index in sorted(found_indexes)]
+        else:
+            found_keywords = []
+            for keyword, keyword_upper in zip(cls._CRYPTO_KEYWORDS, cls._CRYPTO_KEYWORDS_UPPER):
+                if keyword_upper in text_upper:
+                    found_keywords.append(keyword)
         
         if found_keywords:
             contract_info.append(f"🏷️ 关键词: {', '.join(found_keywords)}")
@@ -87,17 +298,18 @@ class MessageProcessor:
     def parse_message(self, raw_message: str) -> Optional[Dict[str, Any]]:
         """解析原始消息"""
         try:
-            logger.info(f"🔍 [解析开始] 开始解析消息: {raw_message[:200]}...")
+            # 原始消息仅在TRACE级别输出
+            logger.opt(lazy=True).trace("🔍 [解析开始] 开始解析消息: {}...", lambda: raw_message[:200])
             
             # 尝试解析JSON
-            if raw_message.startswith('{') or raw_message.startswith('['):
-                data = json.loads(raw_message)
-                logger.info(f"✅ [JSON解析] 成功解析JSON数据")
+            if self._JSON_START_RE.match(raw_message):
+                data = _json_loads(raw_message)
+                logger.debug("✅ [JSON解析] 成功解析JSON数据")
                 result = self._parse_json_message(data)
-                logger.info(f"📊 [解析结果] 消息类型: {result.get('type', 'unknown')}")
+                logger.debug("📊 [解析结果] 消息类型: {}", result.get('type', 'unknown'))
                 return result
             else:
-                logger.info(f"📝 [文本解析] 按文本消息处理")
+                logger.debug("📝 [文本解析] 按文本消息处理")
                 return self._parse_text_message(raw_message)
         except json.JSONDecodeError as e:
             logger.error(f"❌ [JSON错误] JSON解析失败: {e}")
@@ -122,8 +334,8 @@ class MessageProcessor:
                 # 通用消息格式
                 return {
                     'type': 'text',
-                    'content': json.dumps(data, ensure_ascii=False, indent=2),
-                    'timestamp': datetime.now().isoformat(),
+                    'content': _json_dumps_pretty(data),
+                    'timestamp': _now_iso(),
                     'source': 'websocket'
                 }
         elif isinstance(data, list):
@@ -136,7 +348,7 @@ class MessageProcessor:
             return {
                 'type': 'batch',
                 'messages': messages,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': _now_iso()
             }
         else:
             return self._parse_text_message(str(data))
@@ -147,7 +359,7 @@ class MessageProcessor:
             tweet = data.get('tweet', {})
             message_type = data.get('type', 'unknown')
             
-            logger.info(f"🐦 [推文解析] 开始解析推文消息 - 类型: {message_type}")
+            logger.debug("🐦 [推文解析] 开始解析推文消息 - 类型: {}", message_type)
             
             # 提取推文信息
             tweet_type = tweet.get('type', 'TWEET')
@@ -160,77 +372,64 @@ class MessageProcessor:
             # 提取智能合约信息
             contract_info = self.extract_contract_info(tweet_text)
             if contract_info:
-                logger.info(f"🔗 [CA检测] 发现智能合约信息: {len(contract_info)}项")
+                logger.debug("🔗 [CA检测] 发现智能合约信息: {}项", len(contract_info))
             
             # 提取媒体信息
-            media = tweet.get('media', {})
+            media = tweet.get('media') or {}
             media_urls = []
-            if media:
-                if media.get('images'):
-                    # 处理图片URL - 可能是字符串列表或字典列表
-                    for img in media['images']:
-                        if isinstance(img, str):
-                            media_urls.append(img)
-                        elif isinstance(img, dict):
-                            media_urls.append(img.get('url', ''))
-                if media.get('videos'):
-                    # 处理视频URL - 可能是字符串列表或字典列表
-                    for video in media['videos']:
-                        if isinstance(video, str):
-                            media_urls.append(video)
-                        elif isinstance(video, dict):
-                            media_urls.append(video.get('url', ''))
+            # 图片和视频URL - 可能是字符串列表或字典列表，跳过空URL
+            for item in chain(media.get('images') or (), media.get('videos') or ()):
+                url = item if isinstance(item, str) else item.get('url') if isinstance(item, dict) else None
+                if url:
+                    media_urls.append(url)
             
             # 提取提及用户及其简介
-            mentions = []
+            body_mentions = body.get('mentions') or ()
+            mentions = [mention['handle'] for mention in body_mentions if mention.get('handle')]
             mentions_with_ca = []
-            if body.get('mentions'):
-                for mention in body['mentions']:
-                    handle = mention.get('handle', '')
-                    if handle:
-                        mentions.append(handle)
-                        
-                        # 尝试从多个地方获取提及用户的简介
-                        mention_description = ''
-                        
-                        # 1. 直接从mention对象获取
-                        if mention.get('description', {}).get('text'):
-                            mention_description = mention.get('description', {}).get('text', '')
-                        
-                        # 2. 从subtweet的author获取（如果是回复的话）
-                        subtweet = tweet.get('subtweet')
-                        if not mention_description and subtweet and subtweet.get('author', {}).get('handle') == handle:
-                            subtweet_author = subtweet.get('author', {})
-                            mention_description = subtweet_author.get('profile', {}).get('description', {}).get('text', '')
-                        
-                        # 3. 从其他可能的位置获取用户信息
-                        if not mention_description:
-                            # 可以在这里添加从其他API端点获取用户信息的逻辑
-                            pass
-                        
-                        if mention_description:
-                            # 检查简介中是否包含CA信息
-                            ca_info = self.extract_contract_info(mention_description)
-                            if ca_info:
-                                mentions_with_ca.append({
-                                    'handle': handle,
-                                    'description': mention_description,
-                                    'ca_info': ca_info
-                                })
-                                logger.info(f"🔗 [提及用户CA] @{handle} 简介中包含CA信息: {len(ca_info)}项")
+            
+            # subtweet作者在循环外取一次（如果是回复的话，可作为被提及用户的简介来源）；简介仅在匹配时读取
+            subtweet = tweet.get('subtweet')
+            subtweet_author = subtweet.get('author') if isinstance(subtweet, dict) else None
+            subtweet_handle = subtweet_author.get('handle') if isinstance(subtweet_author, dict) else None
+            
+            for mention in body_mentions:
+                handle = mention.get('handle', '')
+                if not handle:
+                    continue
+                    
+                # 1. 直接从mention对象获取简介；2. 从subtweet的author获取
+                mention_description = (mention.get('description') or {}).get('text') or ''
+                if not mention_description and handle == subtweet_handle:
+                    profile = subtweet_author.get('profile')
+                    description = profile.get('description') if isinstance(profile, dict) else None
+                    mention_description = description.get('text', '') if isinstance(description, dict) else ''
+                    
+                if mention_description:
+                    # 检查简介中是否包含CA信息（同一简介的结果会被缓存）
+                    ca_info = _description_contract_info(mention_description)
+                    if ca_info:
+                        mentions_with_ca.append({
+                            'handle': handle,
+                            'description': mention_description,
+                            'ca_info': list(ca_info)
+                        })
+                        logger.debug("🔗 [提及用户CA] @{} 简介中包含CA信息: {}项", handle, len(ca_info))
             
             # 记录原始发布时间
             original_created_at = tweet.get('created_at', '')
-            logger.info(f"📅 [原始时间] 推文原始发布时间: {original_created_at}")
+            logger.debug("📅 [原始时间] 推文原始发布时间: {}", original_created_at)
             
             # 尝试解析时间
             parsed_time = None
             if original_created_at:
-                parsed_time = self._parse_time(original_created_at)
+                # _parse_time按输入缓存，只接受可哈希的字符串和数字；其他类型视为无法解析
+                if isinstance(original_created_at, (str, int, float)):
+                    parsed_time = _parse_time(original_created_at)
                 if parsed_time:
-                    logger.info(f"📅 [解析时间] 解析后时间: {parsed_time}")
+                    logger.debug("📅 [解析时间] 解析后时间: {}", parsed_time)
                 else:
-                    logger.warning(f"📅 [解析时间] 无法解析时间格式: {original_created_at}")
+                    logger.warning("📅 [解析时间] 无法解析时间格式: {}", original_created_at)
             
             result = {
                 'type': 'utrack_tweet',
@@ -246,15 +445,16 @@ class MessageProcessor:
                     'description': author.get('profile', {}).get('description', {}).get('text', '') if author.get('profile', {}).get('description') else ''
                 },
                 'created_at': original_created_at,
+                'created_at_local': parsed_time,  # 已转换为中国时区的发布时间
                 'media_urls': media_urls,
                 'mentions': mentions,
                 'mentions_with_ca': mentions_with_ca,  # 添加包含CA的提及用户信息
                 'reply_to': tweet.get('reply', {}).get('handle', '') if tweet.get('reply') else '',
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _now_iso(),
                 'original': data
             }
             
-            logger.info(f"✅ [推文解析] 推文解析完成 - ID: {result['tweet_id']}, 作者: @{result['author']['handle']}")
+            logger.debug("✅ [推文解析] 推文解析完成 - ID: {}, 作者: @{}", result['tweet_id'], result['author']['handle'])
             return result
             
         except Exception as e:
@@ -265,7 +465,7 @@ class MessageProcessor:
             return {
                 'type': 'text',
                 'content': str(data),
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _now_iso(),
                 'error': str(e)
             }
             
@@ -285,7 +485,7 @@ class MessageProcessor:
                     'description': user.get('profile', {}).get('description', ''),
                     'metrics': user.get('public_metrics', {})
                 },
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _now_iso(),
                 'original': data
             }
         except Exception as e:
@@ -293,7 +493,7 @@ class MessageProcessor:
             return {
                 'type': 'text',
                 'content': str(data),
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _now_iso(),
                 'error': str(e)
             }
             
@@ -305,7 +505,7 @@ class MessageProcessor:
             before = profile_data.get('before', {})
             message_type = data.get('type', 'unknown')
             
-            logger.info(f"👤 [资料更新] 开始解析用户资料更新消息 - 类型: {message_type}")
+            logger.debug("👤 [资料更新] 开始解析用户资料更新消息 - 类型: {}", message_type)
             
             # 提取用户信息
             user_info = {
@@ -351,11 +551,11 @@ class MessageProcessor:
                 'user': user_info,
                 'before': before_info,
                 'changes': changes,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _now_iso(),
                 'original': data
             }
             
-            logger.info(f"✅ [资料更新] 用户资料更新解析完成 - 用户: @{user_info['handle']}, 变更: {len(changes)}项")
+            logger.debug("✅ [资料更新] 用户资料更新解析完成 - 用户: @{}, 变更: {}项", user_info['handle'], len(changes))
             return result
             
         except Exception as e:
@@ -363,7 +563,7 @@ class MessageProcessor:
             return {
                 'type': 'text',
                 'content': str(data),
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _now_iso(),
                 'error': str(e)
             }
             
@@ -372,85 +572,10 @@ class MessageProcessor:
         return {
             'type': 'text',
             'content': text,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'source': 'websocket'
         }
         
-    def _parse_time(self, time_str: str) -> Optional[str]:
-        """解析多种时间格式并转换为中国时区 (UTC+8)"""
-        if not time_str:
-            return None
-        
-        try:
-            # 尝试Unix时间戳 (秒或毫秒)
-            try:
-                timestamp = int(time_str)
-                if timestamp > 1000000000000:  # 毫秒时间戳
-                    timestamp = timestamp / 1000
-                # 假设时间戳是UTC时间，转换为中国时区
-                utc_time = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-                china_time = utc_time.astimezone(CHINA_TIMEZONE)  # 转换为中国时区
-                return china_time.strftime('%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                pass
-            
-            # 尝试ISO格式 (2025-08-01T14:30:00Z 或 2025-08-01T14:30:00+00:00)
-            if 'T' in time_str and ('Z' in time_str or '+' in time_str):
-                # 处理UTC时间
-                if time_str.endswith('Z'):
-                    time_str = time_str.replace('Z', '+00:00')
-                tweet_time = datetime.fromisoformat(time_str)
-                # 转换为中国时区
-                china_time = tweet_time.astimezone(CHINA_TIMEZONE)
-                return china_time.strftime('%Y-%m-%d %H:%M:%S')
-            
-            # 尝试Twitter格式 (Wed Aug 01 14:30:00 +0000 2025)
-            try:
-                tweet_time = datetime.strptime(time_str, '%a %b %d %H:%M:%S %z %Y')
-                # 转换为中国时区
-                china_time = tweet_time.astimezone(CHINA_TIMEZONE)
-                return china_time.strftime('%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                pass
-            
-            # 尝试简单日期时间格式 (2025-08-01 14:30:00)
-            try:
-                tweet_time = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S')
-                # 假设是UTC时间，转换为中国时区
-                utc_time = tweet_time.replace(tzinfo=timezone.utc)
-                china_time = utc_time.astimezone(CHINA_TIMEZONE)
-                return china_time.strftime('%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                pass
-            
-            # 尝试其他常见格式
-            formats = [
-                '%Y-%m-%d %H:%M:%S',
-                '%Y-%m-%dT%H:%M:%S',
-                '%Y-%m-%dT%H:%M:%SZ',
-                '%Y-%m-%dT%H:%M:%S.%fZ',
-                '%Y-%m-%dT%H:%M:%S.%f',
-                '%Y-%m-%d %H:%M',
-                '%Y-%m-%d'
-            ]
-            
-            for fmt in formats:
-                try:
-                    tweet_time = datetime.strptime(time_str, fmt)
-                    # 假设是UTC时间，转换为中国时区
-                    utc_time = tweet_time.replace(tzinfo=timezone.utc)
-                    china_time = utc_time.astimezone(CHINA_TIMEZONE)
-                    return china_time.strftime('%Y-%m-%d %H:%M:%S')
-                except ValueError:
-                    continue
-            
-            # 如果所有格式都失败，返回None
-            return None
-            
-        except Exception as e:
-            logger.error(f"时间解析错误: {e}, 时间字符串: {time_str}")
-            return None
-        
     def format_telegram_message(self, parsed_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """格式化Telegram消息"""
         try:
@@ -483,84 +608,49 @@ class MessageProcessor:
         reply_to = tweet_data.get('reply_to', '')
         media_urls = tweet_data.get('media_urls', [])
         created_at = tweet_data.get('created_at', '')
+        created_at_local = tweet_data.get('created_at_local')
         contract_info = tweet_data.get('contract_info', [])  # 获取智能合约信息
         
-        # 推文类型emoji映射
-        type_emoji = {
-            'TWEET': '📝',
-            'REPLY': '💬',
-            'RETWEET': '🔄',
-            'QUOTE': '💭'
-        }
-        
-        # 构建消息文本
-        message_text = f"{type_emoji.get(tweet_type, '📝')} <b>推文更新</b>\n\n"
-        
-        # 推文类型
-        message_text += f"<b>推文类型:</b> {type_emoji.get(tweet_type, '📝')} {tweet_type}\n"
-        
-        # 作者信息
-        message_text += f"<b>用户名:</b> @{author.get('handle', 'unknown')}\n"
-        if author.get('name'):
-            message_text += f"<b>用户昵称:</b> {author.get('name')}\n"
-        
-        # 如果是回复
-        if tweet_type == 'REPLY' and reply_to:
-            message_text += f"<b>回复给用户:</b> @{reply_to}\n"
+        type_emoji = self._TWEET_TYPE_EMOJI.get(tweet_type, '📝')
         
-        # 推文内容
-        if text:
-            message_text += f"<b>推文内容:</b> {text}\n"
+        handle = author.get('handle', 'unknown')
         
         # 智能合约信息
+        ca_block = ''
         if contract_info:
-            message_text += f"\n<b>🔗 CA:</b>\n"
-            for info in contract_info:
-                message_text += f"• {info}\n"
-        
-        # 提及的用户
-        if mentions:
-            mentions_text = ', '.join([f"@{m}" for m in mentions])
-            message_text += f"<b>提及用户:</b> {mentions_text}\n"
+            ca_block = "\n<b>🔗 CA:</b>\n" + ''.join([f"• {info}\n" for info in contract_info])
         
         # 提及用户的CA信息
+        mentions_ca_block = ''
         if mentions_with_ca:
-            message_text += f"\n<b>🔗 提及用户CA:</b>\n"
-            for mention_ca in mentions_with_ca:
-                handle = mention_ca.get('handle', '')
-                description = mention_ca.get('description', '')
-                ca_info = mention_ca.get('ca_info', [])
-                
-                message_text += f"• <b>@{handle}</b>\n"
-                message_text += f"  简介: {description[:100]}...\n"
-                for info in ca_info:
-                    message_text += f"  {info}\n"
-                message_text += "\n"
-        
-        # 推文链接
-        tweet_url = f"https://x.com/{author.get('handle', 'unknown')}/status/{tweet_data.get('tweet_id', '')}"
-        message_text += f"<b>推文链接:</b> {tweet_url}\n"
-        
-        # 时间信息
-        if created_at:
-            try:
-                # 尝试多种时间格式解析
-                tweet_time = self._parse_time(created_at)
-                if tweet_time:
-                    message_text += f"<b>发布时间:</b> {tweet_time}\n"
-                else:
-                    message_text += f"<b>发布时间:</b> {created_at}\n"
-            except Exception as e:
-                logger.error(f"时间解析失败: {e}")
-                message_text += f"<b>发布时间:</b> {created_at}\n"
-        
-        # 媒体信息
-        if media_urls:
-            message_text += f"<b>媒体文件:</b> {len(media_urls)} 个\n"
-        
-        # 截断消息长度
-        if len(message_text) > config.config.MAX_MESSAGE_LENGTH:
-            message_text = message_text[:config.config.MAX_MESSAGE_LENGTH - 100] + "..."
+            mentions_ca_block = "\n<b>🔗 提及用户CA:</b>\n" + ''.join([
+                f"• <b>@{mention_ca.get('handle', '')}</b>\n"
+                f"  简介: {mention_ca.get('description', '')[:100]}...\n"
+                + ''.join([f"  {info}\n" for info in mention_ca.get('ca_info', [])])
+                + "\n"
+                for mention_ca in mentions_with_ca
+            ])
+        
+        # 构建消息文本，缺失的段落为空字符串
+        message_text = self._TWEET_TEMPLATE.format_map({
+            'emoji': type_emoji,
+            'tweet_type': tweet_type,
+            'handle': handle,
+            'name_line': f"<b>用户昵称:</b> {author['name']}\n" if author.get('name') else '',
+            'reply_line': f"<b>回复给用户:</b> @{reply_to}\n" if tweet_type == 'REPLY' and reply_to else '',
+            'text_line': f"<b>推文内容:</b> {text}\n" if text else '',
+            'ca_block': ca_block,
+            'mentions_line': f"<b>提及用户:</b> {', '.join([f'@{m}' for m in mentions])}\n" if mentions else '',
+            'mentions_ca_block': mentions_ca_block,
+            'tweet_id': tweet_data.get('tweet_id', ''),
+            # 优先使用解析阶段已转换的时间，无法解析时显示原始值
+            'time_line': f"<b>发布时间:</b> {created_at_local or created_at}\n" if created_at else '',
+            'media_line': f"<b>媒体文件:</b> {len(media_urls)} 个\n" if media_urls else '',
+        })
+        
+        # 检查消息长度
+        if len(message_text) > MAX_MESSAGE_LENGTH:
+            message_text = message_text[:MAX_MESSAGE_LENGTH - 100] + "..."
         
         # 如果有媒体，返回媒体消息
         if media_urls:
@@ -580,49 +670,38 @@ class MessageProcessor:
         user = following_data.get('user', {})
         message_type = following_data.get('message_type', 'unknown')
         
-        # 消息类型配置
-        type_config = {
-            'following.create': {'emoji': '➕', 'title': '新增关注'},
-            'following.update': {'emoji': '🔄', 'title': '关注更新'},
-            'following.delete': {'emoji': '➖', 'title': '取消关注'},
-            'follower.create': {'emoji': '👤', 'title': '新增粉丝'},
-            'follower.update': {'emoji': '🔄', 'title': '粉丝更新'},
-            'follower.delete': {'emoji': '👋', 'title': '粉丝流失'}
-        }
-        
-        config_info = type_config.get(message_type, {'emoji': '📡', 'title': '关注变动'})
+        config_info = self._FOLLOWING_TYPE_CONFIG.get(message_type, self._FOLLOWING_DEFAULT_CONFIG)
         
         # 构建消息文本
-        message_text = f"{config_info['emoji']} <b>{config_info['title']}</b>\n\n"
+        builder = _BoundedBuilder(MAX_MESSAGE_LENGTH, MAX_MESSAGE_LENGTH - 100)
+        builder.append(f"{config_info['emoji']} <b>{config_info['title']}</b>\n\n")
         
         if user:
-            message_text += f"<b>用户名:</b> @{user.get('handle', 'unknown')}\n"
+            builder.append(f"<b>用户名:</b> @{user.get('handle', 'unknown')}\n")
             
             if user.get('name'):
-                message_text += f"<b>用户昵称:</b> {user.get('name')}\n"
+                builder.append(f"<b>用户昵称:</b> {user.get('name')}\n")
             
             if user.get('description'):
                 desc = user.get('description', '')[:100]
-                message_text += f"<b>用户简介:</b> {desc}...\n"
+                builder.append(f"<b>用户简介:</b> {desc}...\n")
             
             # 用户统计信息
             metrics = user.get('metrics', {})
             if metrics:
-                message_text += f"<b>关注数:</b> {metrics.get('following_count', 0)}\n"
-                message_text += f"<b>粉丝数:</b> {metrics.get('followers_count', 0)}\n"
-                message_text += f"<b>推文数:</b> {metrics.get('tweet_count', 0)}\n"
+                builder.append(f"<b>关注数:</b> {metrics.get('following_count', 0)}\n")
+                builder.append(f"<b>粉丝数:</b> {metrics.get('followers_count', 0)}\n")
+                builder.append(f"<b>推文数:</b> {metrics.get('tweet_count', 0)}\n")
             
             # 用户链接
             user_url = f"https://x.com/{user.get('handle', 'unknown')}"
-            message_text += f"<b>用户链接:</b> {user_url}\n"
+            builder.append(f"<b>用户链接:</b> {user_url}\n")
         
         # 时间信息 - 使用中国时区
-        china_time = datetime.now(CHINA_TIMEZONE)
-        message_text += f"<b>时间:</b> {china_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+        builder.append(f"<b>时间:</b> {_now_china_time()}\n")
         
-        # 截断消息长度
-        if len(message_text) > config.config.MAX_MESSAGE_LENGTH:
-            message_text = message_text[:config.config.MAX_MESSAGE_LENGTH - 100] + "..."
+        # 超出长度的部分在拼接时已截断
+        message_text = builder.finish()
         
         return {
             'type': 'text',
@@ -635,36 +714,32 @@ class MessageProcessor:
         changes = profile_update_data.get('changes', [])
         message_type = profile_update_data.get('message_type', 'unknown')
         
-        # 消息类型配置
-        type_config = {
-            'profile.update': {'emoji': '👤', 'title': '用户资料更新'}
-        }
-        
-        config_info = type_config.get(message_type, {'emoji': '📝', 'title': '资料更新'})
+        config_info = self._PROFILE_UPDATE_TYPE_CONFIG.get(message_type, self._PROFILE_UPDATE_DEFAULT_CONFIG)
         
         # 构建消息文本
-        message_text = f"{config_info['emoji']} <b>{config_info['title']}</b>\n\n"
+        builder = _BoundedBuilder(MAX_MESSAGE_LENGTH, MAX_MESSAGE_LENGTH - 100)
+        builder.append(f"{config_info['emoji']} <b>{config_info['title']}</b>\n\n")
         
         if user:
-            message_text += f"<b>用户名:</b> @{user.get('handle', 'unknown')}\n"
+            builder.append(f"<b>用户名:</b> @{user.get('handle', 'unknown')}\n")
             
             if user.get('name'):
-                message_text += f"<b>用户昵称:</b> {user.get('name')}\n"
+                builder.append(f"<b>用户昵称:</b> {user.get('name')}\n")
             
             if user.get('description'):
                 desc = user.get('description', '')[:100]
-                message_text += f"<b>用户简介:</b> {desc}...\n"
+                builder.append(f"<b>用户简介:</b> {desc}...\n")
             
             if user.get('location'):
-                message_text += f"<b>位置:</b> {user.get('location')}\n"
+                builder.append(f"<b>位置:</b> {user.get('location')}\n")
             
             # 用户统计信息
             metrics = user.get('metrics', {})
             if metrics:
-                message_text += f"<b>推文数:</b> {metrics.get('tweets', 0)}\n"
-                message_text += f"<b>关注数:</b> {metrics.get('friends', 0)}\n"
-                message_text += f"<b>粉丝数:</b> {metrics.get('followers', 0)}\n"
-                message_text += f"<b>点赞数:</b> {metrics.get('likes', 0)}\n"
+                builder.append(f"<b>推文数:</b> {metrics.get('tweets', 0)}\n")
+                builder.append(f"<b>关注数:</b> {metrics.get('friends', 0)}\n")
+                builder.append(f"<b>粉丝数:</b> {metrics.get('followers', 0)}\n")
+                builder.append(f"<b>点赞数:</b> {metrics.get('likes', 0)}\n")
             
             # 用户状态
             status_indicators = []
@@ -678,27 +753,26 @@ class MessageProcessor:
                 status_indicators.append("🚫 受限账户")
             
             if status_indicators:
-                message_text += f"<b>账户状态:</b> {', '.join(status_indicators)}\n"
+                builder.append(f"<b>账户状态:</b> {', '.join(status_indicators)}\n")
             
             # 变更信息
             if changes:
-                message_text += f"\n<b>📝 变更内容:</b>\n"
+                builder.append(f"\n<b>📝 变更内容:</b>\n")
                 for change in changes:
-                    message_text += f"• {change}\n"
+                    if not builder.append(f"• {change}\n"):
+                        break
             else:
-                message_text += f"\n<b>📝 变更内容:</b> 无具体变更\n"
+                builder.append(f"\n<b>📝 变更内容:</b> 无具体变更\n")
             
             # 用户链接
             user_url = f"https://x.com/{user.get('handle', 'unknown')}"
-            message_text += f"<b>用户链接:</b> {user_url}\n"
+            builder.append(f"<b>用户链接:</b> {user_url}\n")
         
         # 时间信息 - 使用中国时区
-        china_time = datetime.now(CHINA_TIMEZONE)
-        message_text += f"<b>时间:</b> {china_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+        builder.append(f"<b>时间:</b> {_now_china_time()}\n")
         
-        # 截断消息长度
-        if len(message_text) > config.config.MAX_MESSAGE_LENGTH:
-            message_text = message_text[:config.config.MAX_MESSAGE_LENGTH - 100] + "..."
+        # 超出长度的部分在拼接时已截断
+        message_text = builder.finish()
         
         return {
             'type': 'text',
@@ -716,8 +790,8 @@ class MessageProcessor:
             message_text = f"💬 <b>消息</b>\n\n{content}"
             
         # 截断消息长度
-        if len(message_text) > config.config.MAX_MESSAGE_LENGTH:
-            message_text = message_text[:config.config.MAX_MESSAGE_LENGTH - 100] + "..."
+        if len(message_text) > MAX_MESSAGE_LENGTH:
+            message_text = message_text[:MAX_MESSAGE_LENGTH - 100] + "..."
             
         return {
             'type': 'text',
@@ -731,35 +805,40 @@ class MessageProcessor:
             return None
             
         # 合并所有消息
-        combined_text = "📦 <b>批量消息</b>\n\n"
+        parts = ["📦 <b>批量消息</b>\n\n"]
         for i, msg in enumerate(messages[:5], 1):  # 最多显示5条
             if msg.get('type') == 'utrack_tweet':
                 user = msg.get('author', {}).get('handle', 'unknown')
                 text = msg.get('text', '')[:100]
-                combined_text += f"{i}. @{user}: {text}...\n"
+                parts.append(f"{i}. @{user}: {text}...\n")
             elif msg.get('type') == 'utrack_profile_update':
                 user = msg.get('user', {}).get('handle', 'unknown')
-                combined_text += f"{i}. @{user}: 用户资料更新...\n"
+                parts.append(f"{i}. @{user}: 用户资料更新...\n")
             else:
                 content = msg.get('content', '')[:100]
-                combined_text += f"{i}. {content}...\n"
+                parts.append(f"{i}. {content}...\n")
                 
         if len(messages) > 5:
-            combined_text += f"\n... 还有 {len(messages) - 5} 条消息"
+            parts.append(f"\n... 还有 {len(messages) - 5} 条消息")
             
         return {
             'type': 'text',
-            'text': combined_text
+            'text': ''.join(parts)
         }
         
     def _format_generic_message(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """格式化通用消息"""
         content = str(data)
         
-        if len(content) > config.config.MAX_MESSAGE_LENGTH:
-            content = content[:config.config.MAX_MESSAGE_LENGTH - 100] + "..."
+        if len(content) > MAX_MESSAGE_LENGTH:
+            content = content[:MAX_MESSAGE_LENGTH - 100] + "..."
             
         return {
             'type': 'text',
             'text': f"📄 <b>数据消息</b>\n\n{content}"
-        } 
\ No newline at end of file
+        }
+
+@lru_cache(maxsize=1024)
+def _description_contract_info(description: str) -> tuple:
+    """提取用户简介中的智能合约信息，简介重复出现时直接复用结果"""
+    return tuple(MessageProcessor.extract_contract_info(description))
@@ -49,7 +49,7 @@ check_dependencies() {
     fi
     
     # 检查是否安装了依赖
-    if ! python3 -c "import websockets, telegram, loguru, pydantic" 2>/dev/null; then
+    if ! python3 -c "import websockets, telegram, loguru, dotenv" 2>/dev/null; then
         print_warning "依赖未安装，正在安装..."
         pip3 install -r requirements.txt
         print_success "依赖安装完成"
@@ -2,45 +2,85 @@ import asyncio
 import json
 from typing import Optional, Dict, Any
 from telegram import Bot
-from telegram.error import TelegramError
+from telegram.error import BadRequest, TelegramError
+from telegram.request import HTTPXRequest
+from aiolimiter import AsyncLimiter
 from loguru import logger
-import config
+from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, BATCH_SIZE, MAX_TG_QUEUE, MAX_MESSAGE_LENGTH
+
+# HTTP/2 需要 h2 包（httpx[http2]），未安装时回退到 HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP_VERSION = "2"
+except ImportError:
+    HTTP_VERSION = "1.1"
 
 class TelegramClient:
     """Telegram客户端，用于发送消息到Telegram"""
     
+    # 合并文本消息时使用的分隔符
+    _COALESCE_SEPARATOR = "\n\n---\n\n"
+    
     def __init__(self):
-        self.bot = Bot(token=config.config.TELEGRAM_BOT_TOKEN)
-        self.chat_id = config.config.TELEGRAM_CHAT_ID
-        self.message_queue = asyncio.Queue()
+        # 连接池复用长连接，并发发送时无需等待空闲连接或重新握手
+        self.bot = Bot(
+            token=TELEGRAM_BOT_TOKEN,
+            request=HTTPXRequest(
+                connection_pool_size=32,
+                http_version=HTTP_VERSION,
+                pool_timeout=1.0,
+                connect_timeout=2.0
+            )
+        )
+        self.chat_id = TELEGRAM_CHAT_ID
+        self.message_queue = asyncio.Queue(maxsize=MAX_TG_QUEUE)
         self.is_running = False
+        self._processor_task: Optional[asyncio.Task] = None
+        self.coalesced_count = 0  # 被合并到其他消息中发送的文本消息数
+        
+        # Telegram限流：机器人全局30条/秒；群组(ID以-开头)20条/分钟，私聊1条/秒
+        self._global_lim = AsyncLimiter(30, 1)
+        if str(TELEGRAM_CHAT_ID).startswith('-'):
+            self._chat_lim = AsyncLimiter(20, 60)
+        else:
+            self._chat_lim = AsyncLimiter(1, 1)
         
     async def start(self):
         """启动Telegram客户端"""
-        if not config.config.TELEGRAM_BOT_TOKEN or not config.config.TELEGRAM_CHAT_ID:
+        if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
             raise ValueError("TELEGRAM_BOT_TOKEN 和 TELEGRAM_CHAT_ID 必须配置")
         
         self.is_running = True
         logger.info("Telegram客户端已启动")
         
         # 启动消息处理器
-        asyncio.create_task(self._message_processor())
+        self._processor_task = asyncio.create_task(self._message_processor())
         
     async def stop(self):
         """停止Telegram客户端"""
         self.is_running = False
+        
+        # 处理器阻塞在队列上，需取消才能退出
+        if self._processor_task:
+            self._processor_task.cancel()
+            self._processor_task = None
+            
         logger.info("Telegram客户端已停止")
         
+    async def _send_text(self, text: str, parse_mode: str = "HTML"):
+        """发送文本消息，异常交给调用方处理"""
+        await self.bot.send_message(
+            chat_id=self.chat_id,
+            text=text,
+            parse_mode=parse_mode,
+            disable_web_page_preview=False
+        )
+        logger.opt(lazy=True).debug("消息已发送到Telegram: {}...", lambda: text[:100])
+        
     async def send_message(self, text: str, parse_mode: str = "HTML") -> bool:
         """发送消息到Telegram"""
         try:
-            await self.bot.send_message(
-                chat_id=self.chat_id,
-                text=text,
-                parse_mode=parse_mode,
-                disable_web_page_preview=False
-            )
-            logger.info(f"消息已发送到Telegram: {text[:100]}...")
+            await self._send_text(text, parse_mode)
             return True
         except TelegramError as e:
             logger.error(f"发送Telegram消息失败: {e}")
@@ -58,7 +98,7 @@ class TelegramClient:
                 caption=caption,
                 parse_mode=parse_mode
             )
-            logger.info(f"图片已发送到Telegram: {caption[:100]}...")
+            logger.opt(lazy=True).debug("图片已发送到Telegram: {}...", lambda: caption[:100])
             return True
         except TelegramError as e:
             logger.error(f"发送Telegram图片失败: {e}")
@@ -74,7 +114,7 @@ class TelegramClient:
                 chat_id=self.chat_id,
                 media=media_items
             )
-            logger.info("媒体组已发送到Telegram")
+            logger.debug("媒体组已发送到Telegram")
             return True
         except TelegramError as e:
             logger.error(f"发送Telegram媒体组失败: {e}")
@@ -83,48 +123,124 @@ class TelegramClient:
             logger.error(f"发送Telegram媒体组时发生未知错误: {e}")
             return False
             
-    async def queue_message(self, message_data: Dict[str, Any]):
-        """将消息加入队列"""
-        await self.message_queue.put(message_data)
+    def enqueue(self, message_data: Dict[str, Any]) -> bool:
+        """将消息加入队列（同步，不阻塞）；队列已满时丢弃最旧的消息并返回False"""
+        try:
+            self.message_queue.put_nowait(message_data)
+            return True
+        except asyncio.QueueFull:
+            self.message_queue.get_nowait()
+            self.message_queue.put_nowait(message_data)
+            logger.warning("Telegram发送队列已满，丢弃最旧消息")
+            return False
         
     async def _message_processor(self):
-        """消息处理器"""
+        """消息处理器：一次取出队列中已有的消息，在限流范围内按顺序发送"""
         while self.is_running:
             try:
-                # 立即处理消息，不等待批次
-                try:
-                    message = await asyncio.wait_for(
-                        self.message_queue.get(), 
-                        timeout=0.1  # 100ms超时，更快响应
-                    )
-                    await self._process_message_batch([message])
-                except asyncio.TimeoutError:
-                    # 超时后继续循环
-                    continue
-                    
+                # 阻塞等待第一条消息，再取走队列中已积压的消息组成一批
+                batch = [await self.message_queue.get()]
+                while len(batch) < BATCH_SIZE:
+                    try:
+                        batch.append(self.message_queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+                        
+                await self._process_message_batch(batch)
+                
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"消息处理器错误: {e}")
                 await asyncio.sleep(0.1)  # 100ms错误恢复间隔
                 
     async def _process_message_batch(self, messages: list):
-        """处理消息批次"""
+        """处理消息批次，合并相邻文本消息后按原顺序逐条发送（同一聊天内不并发，保证推文顺序）"""
+        for message_data in self._coalesce_text_messages(messages):
+            await self._dispatch(message_data)
+        
+    def _coalesce_text_messages(self, messages: list) -> list:
+        """将相邻的文本消息在长度允许时合并为一条，减少API调用；图片和媒体组保持原样"""
+        limit = MAX_MESSAGE_LENGTH - 200
+        separator = self._COALESCE_SEPARATOR
+        result = []
+        group: list = []
+        length = 0
+        
+        def flush():
+            if len(group) == 1:
+                result.append(group[0])
+            elif group:
+                # 保留原始消息，合并发送失败时逐条重发
+                result.append({
+                    "type": "text",
+                    "text": separator.join(m["text"] for m in group),
+                    "parts": list(group)
+                })
+                self.coalesced_count += len(group) - 1
+            group.clear()
+            
         for message_data in messages:
-            try:
-                message_type = message_data.get("type", "text")
+            if message_data.get("type", "text") != "text" or "text" not in message_data:
+                # 非文本消息先发出之前的文本组，保持相对顺序
+                flush()
+                result.append(message_data)
+                continue
                 
-                if message_type == "text":
-                    await self.send_message(message_data["text"])
-                elif message_type == "photo":
-                    await self.send_photo(
-                        message_data["photo_url"],
-                        message_data.get("caption", "")
-                    )
-                elif message_type == "media_group":
-                    await self.send_media_group(message_data["media_items"])
+            text_length = len(message_data["text"])
+            if group and length + len(separator) + text_length > limit:
+                flush()
+            length = length + len(separator) + text_length if group else text_length
+            group.append(message_data)
+            
+        flush()
+        return result
+        
+    async def _send_coalesced(self, text: str) -> bool:
+        """发送合并后的文本消息，仅当内容被Telegram拒绝(BadRequest)时返回True"""
+        try:
+            await self._send_text(text)
+        except BadRequest as e:
+            logger.warning(f"合并消息内容被Telegram拒绝: {e}")
+            return True
+        except TelegramError as e:
+            # 限流(RetryAfter)、网络错误等与内容无关，拆开重发只会增加请求
+            logger.error(f"发送Telegram消息失败: {e}")
+        except Exception as e:
+            logger.error(f"发送Telegram消息时发生未知错误: {e}")
+        return False
+        
+    async def _dispatch(self, message_data: Dict[str, Any]):
+        """按限流发送单条消息；合并消息因内容被拒绝时拆开逐条重发"""
+        try:
+            message_type = message_data.get("type", "text")
+            parts = message_data.get("parts")
+            rejected = False
+            
+            async with self._global_lim:
+                async with self._chat_lim:
+                    if message_type == "text" and parts:
+                        rejected = await self._send_coalesced(message_data["text"])
+                    elif message_type == "text":
+                        await self.send_message(message_data["text"])
+                    elif message_type == "photo":
+                        await self.send_photo(
+                            message_data["photo_url"],
+                            message_data.get("caption", "")
+                        )
+                    elif message_type == "media_group":
+                        await self.send_media_group(message_data["media_items"])
+                        
+            # 单条内容有误（如无法解析的HTML）会使整条合并消息被拒绝，拆开后只丢失出错的那条
+            if rejected:
+                logger.warning(f"合并消息拆分为 {len(parts)} 条逐条重发")
+                self.coalesced_count -= len(parts) - 1
+                for part in parts:
+                    await self._dispatch(part)
                     
-            except Exception as e:
-                logger.error(f"处理消息时发生错误: {e}")
-                
+        except Exception as e:
+            logger.error(f"处理消息时发生错误: {e}")
+            
     async def test_connection(self) -> bool:
         """测试Telegram连接"""
         try:
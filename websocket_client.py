@@ -1,31 +1,65 @@
 import asyncio
-import json
+import random
 import time
-from typing import Optional, Dict, Any
+from array import array
+from typing import Optional, Dict, Any, List
 from websockets import connect, WebSocketServerProtocol
 from websockets.exceptions import ConnectionClosed, WebSocketException
 from loguru import logger
-import config
+from config import (
+    WSS_URL, MAX_RECONNECT_ATTEMPTS, RECONNECT_INITIAL_S, RECONNECT_MAX_S,
+    RECONNECT_BACKOFF, HEARTBEAT_INTERVAL_S, WS_WORKERS, WS_COMPRESSION
+)
 from telegram_client import TelegramClient
 from message_processor import MessageProcessor
 from datetime import datetime
 
+def _format_ms(timestamp: float) -> str:
+    """时间戳格式化为本地时间字符串（精确到毫秒），仅在日志实际输出时调用"""
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+# 计数器在 WebSocketClient._ctr 中的下标
+_MESSAGES, _ERRORS, _RECONNECTS = range(3)
+
 class WebSocketClient:
     """WebSocket客户端，用于连接Twitter数据源"""
     
+    # 待处理消息队列上限，满时读取循环等待，由WebSocket流控向上游施加背压
+    _WORK_QUEUE_SIZE = 256
+    
+    # 连接持续超过该时长（秒）即视为稳定，断开后从初始间隔重新退避
+    _STABLE_CONNECTION_S = 60
+    
     def __init__(self):
         self.websocket: Optional[WebSocketServerProtocol] = None
         self.telegram_client = TelegramClient()
         self.message_processor = MessageProcessor()
         self.is_running = False
-        self.reconnect_attempts = 0
-        self.last_heartbeat = time.time()
+        self._ctr = array('Q', [0, 0, 0])  # 消息数、错误数、重连次数，连续存放
+        self._last_delay = RECONNECT_INITIAL_S  # 上一次重连等待时间（秒）
         self.connection_start_time = None
-        self.message_count = 0
-        self.error_count = 0
+        self._work_q: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._delay_hist = [0, 0, 0]  # 当前窗口内推文延迟分布：>800ms、>500ms、正常
+        self._delay_task: Optional[asyncio.Task] = None
+        
+    @property
+    def message_count(self) -> int:
+        """已接收消息数"""
+        return self._ctr[_MESSAGES]
+        
+    @property
+    def error_count(self) -> int:
+        """消息处理错误数"""
+        return self._ctr[_ERRORS]
+        
+    @property
+    def reconnect_attempts(self) -> int:
+        """当前连续重连次数"""
+        return self._ctr[_RECONNECTS]
         
     async def start(self):
-        """启动WebSocket客户端"""
+        """启动WebSocket客户端；Telegram不可用或重连次数耗尽时抛出ConnectionError"""
         self.is_running = True
         
         # 启动Telegram客户端
@@ -33,19 +67,33 @@ class WebSocketClient:
         
         # 测试Telegram连接
         if not await self.telegram_client.test_connection():
-            logger.error("Telegram连接失败，请检查配置")
-            return
+            raise ConnectionError("Telegram连接失败，请检查配置")
             
         logger.info("WebSocket客户端启动")
         
+        # 固定数量的处理协程消费消息队列，避免每条消息创建一个任务
+        self._work_q = asyncio.Queue(maxsize=self._WORK_QUEUE_SIZE)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(max(WS_WORKERS, 1))]
+        self._delay_task = asyncio.create_task(self._delay_stats_ticker())
+        
         # 开始连接循环
         while self.is_running:
             try:
                 await self._connect()
+                # 握手成功后连接被关闭同样需要退避，避免服务端立即断开时形成重连风暴；
+                # 长时间没有推文但保持连接的情况同样视为稳定，从初始间隔开始退避
+                if self.is_running:
+                    if time.time() - self.connection_start_time >= self._STABLE_CONNECTION_S:
+                        self._reset_backoff()
+                    await self._handle_connection_failure("连接已关闭")
             except Exception as e:
                 logger.error(f"连接失败: {e}")
                 await self._handle_connection_failure(str(e))
                 
+        # 重连次数耗尽导致的退出属于失败，交由调用方以非零状态码结束
+        if self.reconnect_attempts > MAX_RECONNECT_ATTEMPTS:
+            raise ConnectionError(f"重连次数超过限制 ({MAX_RECONNECT_ATTEMPTS})")
+            
     async def stop(self):
         """停止WebSocket客户端"""
         self.is_running = False
@@ -53,22 +101,30 @@ class WebSocketClient:
         if self.websocket:
             await self.websocket.close()
             
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+        
+        if self._delay_task:
+            self._delay_task.cancel()
+            self._delay_task = None
+            
         await self.telegram_client.stop()
         logger.info("WebSocket客户端已停止")
         
     async def _connect(self):
         """建立WebSocket连接"""
         try:
-            logger.info(f"正在连接到 {config.config.WSS_URL}")
+            logger.info(f"正在连接到 {WSS_URL}")
             
             # 超低延迟WebSocket连接配置
             self.websocket = await connect(
-                config.config.WSS_URL,
-                ping_interval=20,     # 20ms ping间隔，极频繁心跳
-                ping_timeout=10,      # 10ms ping超时，极快检测
+                WSS_URL,
+                ping_interval=HEARTBEAT_INTERVAL_S,  # 协议层PING控制帧作为心跳
+                ping_timeout=10,      # 10秒内未收到PONG视为断线
                 close_timeout=0.5,    # 0.5秒关闭超时
-                max_size=256*1024,    # 256KB最大消息大小，进一步减少内存占用
-                compression=None,      # 禁用压缩减少延迟
+                max_size=1_048_576,   # 1MB最大消息大小，避免媒体较多的推文超限导致断线重连
+                compression=WS_COMPRESSION,  # 默认关闭；推文载荷较大且带宽受限时可配置为deflate
                 max_queue=8,          # 更小队列，减少缓冲
                 read_limit=2**13,     # 更小读取限制，更快处理
                 write_limit=2**13,    # 更小写入限制，更快发送
@@ -80,9 +136,8 @@ class WebSocketClient:
                 }
             )
             
+            # 重连计数和退避间隔在收到第一帧后才重置（见_message_loop），握手成功不代表连接可用
             self.connection_start_time = time.time()
-            self.reconnect_attempts = 0
-            self.last_heartbeat = time.time()
             
             logger.info("WebSocket连接成功")
             
@@ -94,95 +149,109 @@ class WebSocketClient:
             raise
             
     async def _message_loop(self):
-        """超低延迟消息处理循环"""
+        """消息读取循环，连接关闭或出错时退出"""
+        # 循环内只用局部变量，省去每帧的属性查找
+        work_q = self._work_q
+        put_nowait = work_q.put_nowait
+        received = False
+        
         try:
-            # 使用更高效的消息监听方式
-            while self.is_running and not self.websocket.closed:
-                try:
-                    # 使用超短超时，立即处理消息
-                    message = await asyncio.wait_for(
-                        self.websocket.recv(),
-                        timeout=0.01  # 10ms超时，极快响应
-                    )
-                    
-                    if message:
-                        # 立即处理消息，不等待
-                        asyncio.create_task(self._handle_message(message))
-                        
-                except asyncio.TimeoutError:
-                    # 超时继续循环，不记录日志减少开销
-                    continue
-                except ConnectionClosed:
-                    logger.warning("WebSocket连接已关闭")
-                    break
-                except WebSocketException as e:
-                    logger.error(f"WebSocket异常: {e}")
+            # 直接迭代连接，无需每帧创建超时定时器；连接存活由ping_interval检测
+            async for message in self.websocket:
+                if not self.is_running:
                     break
-                except Exception as e:
-                    logger.error(f"消息处理异常: {e}")
-                    # 短暂暂停后继续
-                    await asyncio.sleep(0.001)
                     
+                # 收到第一帧说明连接已可用，重置重连计数和退避间隔
+                if not received:
+                    received = True
+                    self._reset_backoff()
+                    
+                if message:
+                    # 交给处理协程，队列满时等待空位
+                    try:
+                        put_nowait(message)
+                    except asyncio.QueueFull:
+                        await work_q.put(message)
+                        
+            logger.warning("WebSocket连接已关闭")
+            
+        except ConnectionClosed:
+            logger.warning("WebSocket连接已关闭")
+        except WebSocketException as e:
+            logger.error(f"WebSocket异常: {e}")
         except Exception as e:
             logger.error(f"消息循环异常: {e}")
             
+    def _reset_backoff(self):
+        """连接已证明可用，重置重连计数和退避间隔"""
+        self._ctr[_RECONNECTS] = 0
+        self._last_delay = RECONNECT_INITIAL_S
+        
+    async def _worker(self):
+        """消息处理协程，从队列中依次取出消息处理"""
+        while True:
+            message = await self._work_q.get()
+            try:
+                await self._handle_message(message)
+            finally:
+                self._work_q.task_done()
+                
     async def _handle_message(self, message: str):
         """超低延迟消息处理"""
         try:
-            # 获取高精度时间戳
+            # 获取高精度时间戳：墙上时间用于计算推文延迟，单调时钟用于计算处理耗时
+            start_ns = time.monotonic_ns()
             receive_time = time.time()
-            receive_time_ms = int(receive_time * 1000)
-            receive_time_str = datetime.fromtimestamp(receive_time).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
             
-            self.message_count += 1
+            self._ctr[_MESSAGES] += 1
             
-            # 记录接收时间日志
-            logger.info(f"📨 [接收时间] 时间戳: {receive_time_ms}ms")
-            logger.info(f"📨 [接收时间] 格式化: {receive_time_str}")
-            
-            # 快速检查是否为Twitter消息
-            is_twitter = self.message_processor.is_twitter_message(message)
+            # 记录接收时间日志（DEBUG级别；格式化时间仅在实际输出时计算）
+            logger.debug("📨 [接收时间] 时间戳: {}ms", int(receive_time * 1000))
+            logger.opt(lazy=True).debug("📨 [接收时间] 格式化: {}", lambda: _format_ms(receive_time))
             
             # 解析消息
             parsed_data = self.message_processor.parse_message(message)
             if not parsed_data:
                 return
                 
+            # UTrack推文帧必然带有"tweet"字段，无需再扫描原始消息；其他消息再做快速检查
+            is_tweet = parsed_data.get('type') == 'utrack_tweet'
+            is_twitter = is_tweet or self.message_processor.is_twitter_message(message)
+            
             # 推文发布时间处理（仅对Twitter消息）
-            if is_twitter and parsed_data.get('type') == 'utrack_tweet':
+            if is_tweet:
                 original_created_at = parsed_data.get('created_at', '')
                 if original_created_at:
                     try:
                         # 记录推文发布时间
-                        logger.info(f"📅 [推文时间] 原始发布时间: {original_created_at}")
+                        logger.debug("📅 [推文时间] 原始发布时间: {}", original_created_at)
                         
                         # 快速时间戳解析
+                        # 先按类型分支，ISO等非数字字符串直接跳过，不依赖异常控制流
                         tweet_timestamp = None
-                        if isinstance(original_created_at, (int, str)):
-                            try:
-                                timestamp = int(original_created_at)
-                                if timestamp > 1000000000000:  # 毫秒时间戳
-                                    timestamp = timestamp / 1000
-                                tweet_timestamp = timestamp
-                            except ValueError:
-                                pass
+                        if isinstance(original_created_at, int):
+                            tweet_timestamp = original_created_at
+                        elif isinstance(original_created_at, str) and original_created_at.isdecimal():
+                            tweet_timestamp = int(original_created_at)
+                            
+                        if tweet_timestamp and tweet_timestamp > 1000000000000:  # 毫秒时间戳
+                            tweet_timestamp = tweet_timestamp / 1000
                         
                         if tweet_timestamp:
                             # 记录解析后的推文时间
-                            tweet_time_str = datetime.fromtimestamp(tweet_timestamp).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-                            logger.info(f"📅 [推文时间] 解析后时间: {tweet_time_str}")
+                            logger.opt(lazy=True).debug("📅 [推文时间] 解析后时间: {}", lambda: _format_ms(tweet_timestamp))
                             
                             # 计算延迟（毫秒）
                             delay_ms = int((receive_time - tweet_timestamp) * 1000)
-                            logger.info(f"🚀 [延迟监控] 推文发布到接收延迟: {delay_ms}ms")
+                            logger.debug("🚀 [延迟监控] 推文发布到接收延迟: {}ms", delay_ms)
                             
-                            # 延迟警告
+                            # 延迟分级计数，由_delay_stats_ticker每秒汇总输出
                             if delay_ms > 800:
-                                logger.warning(f"⚠️ [延迟警告] 延迟过高: {delay_ms}ms")
+                                self._delay_hist[0] += 1
                             elif delay_ms > 500:
-                                logger.warning(f"⚠️ [延迟警告] 延迟较高: {delay_ms}ms")
+                                self._delay_hist[1] += 1
                             else:
-                                logger.info(f"✅ [延迟监控] 延迟正常: {delay_ms}ms")
+                                self._delay_hist[2] += 1
                             
                     except Exception as e:
                         logger.error(f"📅 [推文时间] 时间解析错误: {e}")
@@ -192,78 +261,69 @@ class WebSocketClient:
             if not telegram_message:
                 return
                 
-            # 立即发送到Telegram（不等待）
-            asyncio.create_task(self.telegram_client.queue_message(telegram_message))
+            # 加入Telegram发送队列（同步调用，不创建任务也不等待）
+            self.telegram_client.enqueue(telegram_message)
             
             # 计算处理时间
-            processing_time = (time.time() - receive_time) * 1000
+            processing_time = (time.monotonic_ns() - start_ns) / 1_000_000
             
             # 记录性能统计
             if is_twitter:
-                logger.info(f"🐦 [Twitter消息] 处理完成 - 耗时: {processing_time:.2f}ms")
+                logger.info("🐦 [Twitter消息] 处理完成 - 耗时: {:.2f}ms", processing_time)
             else:
-                logger.debug(f"💬 [普通消息] 处理完成 - 耗时: {processing_time:.2f}ms")
+                logger.debug("💬 [普通消息] 处理完成 - 耗时: {:.2f}ms", processing_time)
                 
         except Exception as e:
-            self.error_count += 1
+            self._ctr[_ERRORS] += 1
             logger.error(f"处理消息时发生错误: {e}")
             
     async def _handle_connection_failure(self, reason: str):
         """处理连接失败"""
-        self.reconnect_attempts += 1
+        self._ctr[_RECONNECTS] += 1
+        attempts = self._ctr[_RECONNECTS]
         
-        if self.reconnect_attempts > config.config.MAX_RECONNECT_ATTEMPTS:
-            logger.error(f"重连次数超过限制 ({config.config.MAX_RECONNECT_ATTEMPTS})，停止重连")
+        if attempts > MAX_RECONNECT_ATTEMPTS:
+            logger.error(f"重连次数超过限制 ({MAX_RECONNECT_ATTEMPTS})，停止重连")
             self.is_running = False
             return
             
-        # 超快重连策略
-        delay = min(
-            config.config.RECONNECT_INTERVAL * (1.005 ** min(self.reconnect_attempts, 3)),  # 极小的退避倍数
-            1000  # 最大1秒延迟
-        )
+        # 去相关抖动退避：在[初始间隔, 上次间隔*倍数]内随机取值，持续失败时间隔增长，多客户端不会同时重连
+        delay = min(RECONNECT_MAX_S, random.uniform(RECONNECT_INITIAL_S, self._last_delay * RECONNECT_BACKOFF))
+        self._last_delay = delay
         
         logger.warning(f"连接失败: {reason}")
-        logger.info(f"将在 {delay/1000:.1f} 秒后重连 (尝试 {self.reconnect_attempts}/{config.config.MAX_RECONNECT_ATTEMPTS})")
+        logger.info(f"将在 {delay:.1f} 秒后重连 (尝试 {attempts}/{MAX_RECONNECT_ATTEMPTS})")
         
-        await asyncio.sleep(delay / 1000)
-                
-    async def send_heartbeat(self):
-        """发送心跳"""
-        if self.websocket and self.is_running:
-            try:
-                heartbeat_msg = {
-                    "type": "ping",
-                    "timestamp": time.time()
-                }
-                await self.websocket.send(json.dumps(heartbeat_msg))
-                self.last_heartbeat = time.time()
-                logger.debug("心跳已发送")
-            except Exception as e:
-                logger.error(f"发送心跳失败: {e}")
+        await asyncio.sleep(delay)
                 
     def get_stats(self) -> Dict[str, Any]:
         """获取统计信息"""
         uptime = time.time() - (self.connection_start_time or time.time())
+        # 一次性取出全部计数器，保证同一份快照
+        message_count, error_count, reconnect_attempts = self._ctr
         
         return {
             "uptime_seconds": uptime,
-            "message_count": self.message_count,
-            "error_count": self.error_count,
-            "reconnect_attempts": self.reconnect_attempts,
+            "message_count": message_count,
+            "error_count": error_count,
+            "reconnect_attempts": reconnect_attempts,
             "is_connected": self.websocket is not None and not self.websocket.closed,
-            "last_heartbeat": self.last_heartbeat
+            "coalesced_count": self.telegram_client.coalesced_count
         }
         
-    async def start_heartbeat_loop(self):
-        """启动心跳循环"""
-        while self.is_running:
-            try:
-                await asyncio.sleep(config.config.HEARTBEAT_INTERVAL / 1000)
-                if self.is_running:
-                    await self.send_heartbeat()
-            except Exception as e:
-                logger.error(f"心跳循环错误: {e}")
+    async def _delay_stats_ticker(self):
+        """每秒汇总输出一次推文延迟分布，窗口内没有推文时不输出"""
+        while True:
+            await asyncio.sleep(1)
+            high, elevated, normal = self._delay_hist
+            if not (high or elevated or normal):
+                continue
+            self._delay_hist = [0, 0, 0]
+            
+            if high or elevated:
+                logger.warning("⚠️ [延迟警告] 最近1秒推文延迟 过高(>800ms): {} 较高(>500ms): {} 正常: {}", high, elevated, normal)
+            else:
+                logger.info("✅ [延迟监控] 最近1秒推文延迟正常: {} 条", normal)
                 
     async def start_stats_monitor(self):
         """启动统计监控"""